@@ -46,3 +46,40 @@ def test_download_unzip():
             assert os.path.exists(
                 os.path.join(unzip_directory, file_name)
             ), f"unzip failed, missing {file_name}"
+
+
+def test_parse_num_processors():
+    """Processor count settings should parse to an int number of processors."""
+    # If (and only if) Emme is not installed, replace INRO libraries with MagicMock
+    try:
+        import inro.emme.database.emmebank
+    except ModuleNotFoundError:
+        sys.modules["inro.emme.database.emmebank"] = MagicMock()
+        sys.modules["inro.emme.network"] = MagicMock()
+        sys.modules["inro.emme.database.scenario"] = MagicMock()
+        sys.modules["inro.emme.database.matrix"] = MagicMock()
+        sys.modules["inro.emme.network.node"] = MagicMock()
+        sys.modules["inro.emme.desktop.app"] = MagicMock()
+        sys.modules["inro"] = MagicMock()
+        sys.modules["inro.modeller"] = MagicMock()
+
+    import multiprocessing
+
+    from tm2py.tools import parse_num_processors
+
+    max_processors = multiprocessing.cpu_count()
+    assert parse_num_processors("MAX") == max_processors
+    assert parse_num_processors("max") == max_processors
+    assert parse_num_processors("1") == 1
+    assert parse_num_processors(f"MAX-{max_processors}") == 1
+    assert parse_num_processors("MAX - 0") == max_processors
+    assert parse_num_processors(1.0) == 1
+    assert isinstance(parse_num_processors(1.0), int)
+    with pytest.raises(Exception):
+        parse_num_processors("MAX+1")
+    with pytest.raises(Exception):
+        parse_num_processors(0)
+    with pytest.raises(Exception):
+        parse_num_processors("0")
+    with pytest.raises(Exception):
+        parse_num_processors(str(max_processors + 1))
@@ -37,6 +37,8 @@ class Component(ABC):
     def __init__(self, controller: RunController):
         self._controller = controller
         self._trace = None
+        # mapping of time period name to Emme scenario ID, built on first use
+        self._scenario_ids = None
 
     @property
     def controller(self):
@@ -60,10 +62,11 @@ class Component(ABC):
         if not os.path.isabs(emmebank_path):
             emmebank_path = self.get_abs_path(emmebank_path)
         emmebank = self.controller.emme_manager.emmebank(emmebank_path)
-        scenario_id = {tp.name: tp.emme_scenario_id for tp in self.config.time_periods}[
-            time_period
-        ]
-        return emmebank.scenario(scenario_id)
+        if self._scenario_ids is None:
+            self._scenario_ids = {
+                tp.name: tp.emme_scenario_id for tp in self.config.time_periods
+            }
+        return emmebank.scenario(self._scenario_ids[time_period])
 
     @property
     def config(self):
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 from abc import ABC
+from contextlib import contextmanager as _context
 from typing import Dict, Union, List, TYPE_CHECKING
 import numpy as np
 
@@ -18,23 +19,62 @@ class PrepareDemand(Component, ABC):
     def __init__(self, controller: RunController):
         super().__init__(controller)
         self._emmebank = None
-
-    def _read(self, path, name, num_zones, factor=None):
-        with OMXManager(path, "r") as omx_file:
-            demand = omx_file.read(name)
-        if factor is not None:
-            demand = factor * demand
-        demand = self._redim_demand(demand, num_zones)
-        return demand
+        # open OMX files by path, shared across reads of the same file,
+        # only available within _setup
+        self._omx_files = None
+
+    @_context
+    def _setup(self):
+        """Keep demand OMX files open across reads and close them all on exit."""
+        self._omx_files = {}
+        try:
+            yield
+        finally:
+            for omx_file in self._omx_files.values():
+                omx_file.close()
+            self._omx_files = None
+
+    def _read(self, path, name):
+        if self._omx_files is None:
+            raise Exception("demand OMX files can only be read within _setup")
+        omx_file = self._omx_files.get(path)
+        if omx_file is None:
+            omx_file = OMXManager(path, "r")
+            omx_file.open()
+            self._omx_files[path] = omx_file
+        # each matrix is added to the total demand once, do not keep the
+        # arrays in the OMXManager read cache while the file is open
+        return omx_file.read(name, cache=False)
 
     @staticmethod
-    def _redim_demand(demand, num_zones):
-        _shape = demand.shape
-        if _shape != (num_zones, num_zones):
-            demand = np.pad(
-                demand, ((0, num_zones - _shape[0]), (0, num_zones - _shape[1]))
+    def _add_demand(total, demand, num_zones, factor=None):
+        """Add demand (in place) to the top-left block of the total demand array.
+
+        Demand arrays with fewer zones than the total (e.g. without external zones)
+        are added to the corresponding block, without padding to a full-size copy.
+        The total is created with the first demand and has the dtype of the demand
+        arrays (promoted if a later array has a wider dtype), so the sum is
+        calculated in the same precision as adding the arrays directly.
+
+        Returns:
+            Total demand array
+        """
+        rows, cols = demand.shape
+        if rows > num_zones or cols > num_zones:
+            raise Exception(
+                f"demand shape {demand.shape} exceeds zone system {num_zones}"
             )
-        return demand
+        # factor defaults to 1.0 in the config, skip the full-matrix multiply
+        if factor is not None and factor != 1.0:
+            demand = factor * demand
+        if total is None:
+            total = np.zeros((num_zones, num_zones), dtype=demand.dtype)
+        else:
+            dtype = np.result_type(total, demand)
+            if total.dtype != dtype:
+                total = total.astype(dtype)
+        total[:rows, :cols] += demand
+        return total
 
     # Disable too many arguments recommendation
     # pylint: disable=R0913
@@ -51,7 +91,14 @@ class PrepareDemand(Component, ABC):
             if not matrix:
                 raise Exception(f"error averaging demand: matrix {name} does not exist")
             prev_demand = matrix.get_numpy_data(scenario.id)
-            demand = prev_demand + (1.0 / msa_iteration) * (demand - prev_demand)
+            # prev + (1 / k) * (demand - prev), calculated in place in demand,
+            # in the same dtype as the expression (promoted with prev if wider)
+            dtype = np.result_type(demand, prev_demand)
+            if demand.dtype != dtype:
+                demand = demand.astype(dtype)
+            demand -= prev_demand
+            demand *= 1.0 / msa_iteration
+            demand += prev_demand
 
         matrix.set_numpy_data(demand, scenario.id)
 
@@ -88,8 +135,12 @@ class PrepareHighwayDemand(PrepareDemand):
         self._emmebank = self.controller.emme_manager.emmebank(self._emmebank_path)
         self._create_zero_matrix()
         for time in self.time_period_names():
-            for klass in self.config.highway.classes:
-                self._prepare_demand(klass.name, klass.description, klass.demand, time)
+            # demand files are by period, shared by several classes
+            with self._setup():
+                for klass in self.config.highway.classes:
+                    self._prepare_demand(
+                        klass.name, klass.description, klass.demand, time
+                    )
 
     def _prepare_demand(
         self,
@@ -111,23 +162,28 @@ class PrepareHighwayDemand(PrepareDemand):
                  "factor": <factor to apply to demand in this file>}
             time_period (str): the time time_period ID (name)
         """
+        if not demand_config:
+            raise Exception(f"highway.classes {name}: no demand files specified")
         scenario = self.get_emme_scenario(self._emmebank_path, time_period)
         num_zones = len(scenario.zone_numbers)
-        demand = self._read_demand(demand_config[0], time_period, num_zones)
-        for file_config in demand_config[1:]:
-            demand = demand + self._read_demand(file_config, time_period, num_zones)
+        # accumulate in place into a single array
+        demand = None
+        for file_config in demand_config:
+            demand = self._read_demand(file_config, time_period, num_zones, demand)
         demand_name = f"{time_period}_{name}"
         description = f"{time_period} {description} demand"
         self._save_demand(demand_name, demand, scenario, description, apply_msa=True)
 
-    def _read_demand(self, file_config, time_period, num_zones):
+    def _read_demand(self, file_config, time_period, num_zones, demand):
         # Load demand from cross-referenced source file,
-        # the named demand model component under the key highway_demand_file
+        # the named demand model component under the key highway_demand_file,
+        # and add it to the demand array (None for the first file)
         source = file_config["source"]
         name = file_config["name"].format(period=time_period.upper())
         factor = file_config.get("factor")
         path = self.get_abs_path(self.config[source].highway_demand_file)
-        return self._read(path.format(period=time_period), name, num_zones, factor)
+        data = self._read(path.format(period=time_period), name)
+        return self._add_demand(demand, data, num_zones, factor)
 
 
 # class PrepareTransitDemand(PrepareDemand):
@@ -255,9 +255,10 @@ class HighwayAssignment(Component):
             # Total link costs is always the first analysis
             cost = emme_class_spec["path_analyses"][0]["results"]["od_values"]
             factor = emme_class_spec["generalized_cost"]["perception_factor"]
-            gencost_data = self._matrix_cache.get_data(od_travel_times)
+            time_data = self._matrix_cache.get_data(od_travel_times)
             cost_data = self._matrix_cache.get_data(cost)
-            time_data = gencost_data - (factor * cost_data)
+            # subtract in place, the gen cost data is replaced by the time
+            time_data -= factor * cost_data
             self._matrix_cache.set_data(od_travel_times, time_data)
 
     def _set_intrazonal_values(
@@ -30,9 +30,8 @@ from __future__ import annotations
 import array as _array
 from collections import defaultdict as _defaultdict
 from contextlib import contextmanager as _context
-from math import sqrt as _sqrt
 import os
-from typing import Dict, List, Union, BinaryIO, TYPE_CHECKING
+from typing import Dict, List, Union, BinaryIO, TextIO, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
@@ -79,6 +78,7 @@ class AssignMAZSPDemand(Component):
         #       semi-exposed for performance testing
         self._bin_edges = _default_bin_edges
         self._debug = False
+        self._num_processors = parse_num_processors(self.config.emme.num_processors)
 
         # Internal attributes to track data through the sequence of steps
         self._eb_dir = None
@@ -119,6 +119,7 @@ class AssignMAZSPDemand(Component):
                         self._set_link_cost_maz()
                         self._run_shortest_path(time, i, demand_group["dist"])
                         self._assign_flow(time, i, demand_group["demand"])
+                    self._save_flow()
 
     @_context
     def _setup(self, time: str):
@@ -128,7 +129,7 @@ class AssignMAZSPDemand(Component):
             time: name of the time period
         """
         self._mazs = None
-        self._demand = _defaultdict(lambda: [])
+        self._demand = _defaultdict(list)
         self._max_dist = 0
         self._network = None
         self._root_index = None
@@ -196,7 +197,7 @@ class AssignMAZSPDemand(Component):
         network = self._network
         # NOTE: every maz must have a valid #node_county
         if self._mazs is None:
-            self._mazs = _defaultdict(lambda: [])
+            self._mazs = _defaultdict(list)
             for node in network.nodes():
                 if node["@maz_id"]:
                     self._mazs[node["#node_county"]].append(node)
@@ -220,22 +221,34 @@ class AssignMAZSPDemand(Component):
         """
         data = self._read_demand_array(time, index)
         origins, destinations = data.nonzero()
-        for orig, dest in zip(origins, destinations):
-            # skip intra-maz demand
-            if orig == dest:
-                continue
+        # skip intra-maz demand
+        inter_maz = origins != destinations
+        origins = origins[inter_maz]
+        destinations = destinations[inter_maz]
+        if len(origins) == 0:
+            return
+        # calculate demand values and distances for all O-D pairs at once
+        # using arrays of the MAZ coordinates
+        coord_x = np.array([node.x for node in maz_ids])
+        coord_y = np.array([node.y for node in maz_ids])
+        distances = np.sqrt(
+            (coord_x[destinations] - coord_x[origins]) ** 2
+            + (coord_y[destinations] - coord_y[origins]) ** 2
+        )
+        demands = data[origins, destinations]
+        self._max_dist = max(self._max_dist, float(distances.max()))
+        for orig, dest, dem, dist in zip(
+            origins.tolist(),
+            destinations.tolist(),
+            demands.tolist(),
+            distances.tolist(),
+        ):
             orig_node = maz_ids[orig]
-            dest_node = maz_ids[dest]
-            dist = _sqrt(
-                (dest_node.x - orig_node.x) ** 2 + (dest_node.y - orig_node.y) ** 2
-            )
-            if dist > self._max_dist:
-                self._max_dist = dist
             self._demand[orig_node].append(
                 {
                     "orig": orig_node,
-                    "dest": dest_node,
-                    "dem": data[orig][dest],
+                    "dest": maz_ids[dest],
+                    "dem": dem,
                     "dist": dist,
                 }
             )
@@ -275,12 +288,18 @@ class AssignMAZSPDemand(Component):
         demand_groups = [
             {"dist": edge, "demand": []} for i, edge in enumerate(bin_edges[1:])
         ]
-        for data in self._demand.values():
-            max_dist = max(entry["dist"] for entry in data) / 5280.0
-            for group in demand_groups:
-                if max_dist < group["dist"]:
-                    group["demand"].extend(data)
-                    break
+        origin_demand = list(self._demand.values())
+        max_dists = np.array(
+            [max(entry["dist"] for entry in data) for data in origin_demand]
+        )
+        # index of the first bin with upper edge strictly greater than max dist,
+        # for all origins at once
+        group_index = np.searchsorted(
+            bin_edges[1:], max_dists / 5280.0, side="right"
+        ).tolist()
+        for data, index in zip(origin_demand, group_index):
+            if index < len(demand_groups):
+                demand_groups[index]["demand"].extend(data)
         for group in demand_groups:
             self.logger.log_time(
                 f"bin dist {group['dist']}, size {len(group['demand'])}", level="DEBUG"
@@ -307,14 +326,19 @@ class AssignMAZSPDemand(Component):
                 if name in network.attributes(domain):
                     network.delete_attribute(domain, name)
                 network.create_attribute(domain, name)
-        root_maz_ids = {}
-        leaf_maz_ids = {}
+        # many demand entries share the same nodes, collect the unique nodes
+        # first and set the node attributes once per node
+        root_nodes = {}
+        leaf_nodes = {}
         for data in demand:
-            o_node, d_node = data["orig"], data["dest"]
-            root_maz_ids[o_node.number] = o_node["@maz_root"] = o_node["@maz_id"]
-            leaf_maz_ids[d_node.number] = d_node["@maz_leaf"] = d_node["@maz_id"]
-        self._root_index = {p: i for i, p in enumerate(sorted(root_maz_ids.keys()))}
-        self._leaf_index = {q: i for i, q in enumerate(sorted(leaf_maz_ids.keys()))}
+            root_nodes[data["orig"].number] = data["orig"]
+            leaf_nodes[data["dest"].number] = data["dest"]
+        for o_node in root_nodes.values():
+            o_node["@maz_root"] = o_node["@maz_id"]
+        for d_node in leaf_nodes.values():
+            d_node["@maz_leaf"] = d_node["@maz_id"]
+        self._root_index = {p: i for i, p in enumerate(sorted(root_nodes.keys()))}
+        self._leaf_index = {q: i for i, q in enumerate(sorted(leaf_nodes.keys()))}
         self.controller.emme_manager.copy_attr_values(
             "NODE", self._network, self._scenario, ["@maz_root", "@maz_leaf"]
         )
@@ -348,7 +372,6 @@ class AssignMAZSPDemand(Component):
         max_radius = max_radius * 5280 + 100  # add some buffer for rounding error
         ext = "ebp" if _USE_BINARY else "txt"
         file_name = f"sp_{time}_{bin_no}.{ext}"
-        num_processors = parse_num_processors(self.config.emme.num_processors)
         spec = {
             "type": "SHORTEST_PATH",
             "modes": [self.config.highway.maz_to_maz.mode_code],
@@ -375,7 +398,7 @@ class AssignMAZSPDemand(Component):
                 },
             },
             "performance_settings": {
-                "number_of_processors": num_processors,
+                "number_of_processors": self._num_processors,
                 "direction": "FORWARD",
                 "method": "STANDARD",
             },
@@ -415,18 +438,24 @@ class AssignMAZSPDemand(Component):
         """
         paths = self._load_text_format_paths(time, bin_no)
         not_assigned, assigned = 0, 0
+        # sum demand by (i_node, j_node) node numbers, so that each Emme link
+        # is looked up and updated once, instead of once per path using it
+        link_flows = _defaultdict(float)
         for data in demand:
             orig, dest, dem = data["orig"].number, data["dest"].number, data["dem"]
-            path = paths.get(orig, {}).get(dest)
+            orig_paths = paths.get(orig)
+            path = orig_paths.get(dest) if orig_paths is not None else None
             if path is None:
                 not_assigned += dem
                 continue
             i_node = orig
             for j_node in path:
-                link = self._network.link(i_node, j_node)
-                link["temp_flow"] += dem
+                link_flows[(i_node, j_node)] += dem
                 i_node = j_node
             assigned += dem
+        for (i_node, j_node), flow in link_flows.items():
+            link = self._network.link(i_node, j_node)
+            link["temp_flow"] += flow
         self.logger.log_time(
             f"ASSIGN bin {bin_no}: total: {len(demand)}", level="DEBUG"
         )
@@ -434,6 +463,18 @@ class AssignMAZSPDemand(Component):
             f"assigned: {assigned}, not assigned: {not_assigned}", level="DEBUG"
         )
 
+    def _save_flow(self):
+        """Save the temp_flow summed over all demand bins to scenario @maz_flow.
+
+        Copied once per period after all bins are assigned, in one bulk call.
+        Only the binary format assignment saves the flow, the text format
+        assignment leaves @maz_flow unchanged.
+        """
+        if _USE_BINARY:
+            self.controller.emme_manager.copy_attr_values(
+                "LINK", self._network, self._scenario, ["temp_flow"], ["@maz_flow"]
+            )
+
     def _load_text_format_paths(
         self, time: str, bin_no: int
     ) -> Dict[int, Dict[int, List[int]]]:
@@ -447,7 +488,7 @@ class AssignMAZSPDemand(Component):
             All paths as a nested dictionary, path = paths[origin][destination],
             using the node IDs as integers.
         """
-        paths = _defaultdict(lambda: {})
+        paths = _defaultdict(dict)
         with open(
             os.path.join(self._eb_dir, f"sp_{time}_{bin_no}.txt"),
             "r",
@@ -464,8 +505,9 @@ class AssignMAZSPDemand(Component):
         """Assign the demand along the paths generated from the shortest path tool.
 
         The paths are read from a binary format file, see Emme help for details.
-        Demand is summed in self._network (in memory) using temp_flow attribute
-        and written to scenario (Emmebank / disk) @maz_flow.
+        Demand is summed in self._network (in memory) using temp_flow attribute,
+        which is written to scenario (Emmebank / disk) @maz_flow by _save_flow
+        after all demand bins are assigned.
 
         Args:
             time: time period name
@@ -494,9 +536,6 @@ class AssignMAZSPDemand(Component):
                 self._assign_path_flow(paths_file, start, end, data["dem"])
                 assigned += data["dem"]
                 bytes_read += (end - start) * 4
-        self.controller.emme_manager.copy_attr_values(
-            "LINK", self._network, self._scenario, ["temp_flow"], ["@maz_flow"]
-        )
         self.logger.log_time(
             f"ASSIGN bin {bin_no}, total {len(demand)}, assign "
             f"{assigned}, not assign {not_assigned}, bytes {bytes_read}",
@@ -591,6 +630,11 @@ class SkimMAZCosts(Component):
         super().__init__(controller)
         self._scenario = None
         self._network = None
+        self._num_processors = parse_num_processors(self.config.emme.num_processors)
+        # MAZ nodes by county, the currently marked roots and all MAZ IDs (leaves)
+        self._county_mazs = None
+        self._roots = []
+        self._leaf_ids = None
 
     @LogStartEnd()
     def run(self):
@@ -641,14 +685,17 @@ class SkimMAZCosts(Component):
         counties = []
         for group in self.config.highway.maz_to_maz.demand_county_groups:
             counties.extend(group.counties)
-        with self._setup():
+        # results for all counties are appended through the one open file
+        with self._setup(), open(
+            output, "a", newline="", encoding="utf8"
+        ) as output_file:
             self._prepare_network()
             for county in counties:
                 num_roots = self._mark_roots(county)
                 if num_roots == 0:
                     continue
                 sp_values = self._run_shortest_path()
-                self._export_results(sp_values)
+                self._export_results(sp_values, output_file)
 
     @_context
     def _setup(self):
@@ -664,6 +711,9 @@ class SkimMAZCosts(Component):
                 yield
             finally:
                 self._network = None  # clear network obj ref to free memory
+                self._county_mazs = None
+                self._roots = []
+                self._leaf_ids = None
 
     @LogStartEnd()
     def _prepare_network(self):
@@ -679,19 +729,33 @@ class SkimMAZCosts(Component):
         self._network = self.controller.emme_manager.get_network(
             self._scenario, {"NODE": ["@maz_id", "#node_county"]}
         )
+        # index MAZ nodes by county and list the leaf MAZ IDs in one pass,
+        # instead of passes per county
+        self._county_mazs = _defaultdict(list)
+        leaf_ids = []
+        for node in self._network.nodes():
+            maz_id = node["@maz_id"]
+            if maz_id:
+                leaf_ids.append(maz_id)
+            if maz_id > 0:
+                self._county_mazs[node["#node_county"]].append(node)
+        self._leaf_ids = np.array(leaf_ids)
+        self._roots = []
 
     def _mark_roots(self, county: str) -> int:
-        """Mark the available roots in the county."""
-        count_roots = 0
-        for node in self._network.nodes():
-            if node["@maz_id"] > 0 and node["#node_county"] == county:
-                node["@maz_root"] = node["@maz_id"]
-                count_roots += 1
-            else:
-                node["@maz_root"] = 0
+        """Mark the available roots in the county.
+
+        Only the roots of the previous county are reset, using the MAZ
+        by county index from _prepare_network.
+        """
+        for node in self._roots:
+            node["@maz_root"] = 0
+        self._roots = self._county_mazs[county]
+        for node in self._roots:
+            node["@maz_root"] = node["@maz_id"]
         values = self._network.get_attribute_values("NODE", ["@maz_root"])
         self._scenario.set_attribute_values("NODE", ["@maz_root"], values)
-        return count_roots
+        return len(self._roots)
 
     def _run_shortest_path(self) -> Dict[str, NumpyArray]:
         """Run shortest paths tool and return dictionary of skim results name, numpy arrays.
@@ -706,7 +770,6 @@ class SkimMAZCosts(Component):
         shortest_paths_tool = self.controller.emme_manager.tool(
             "inro.emme.network_calculation.shortest_path"
         )
-        num_processors = parse_num_processors(self.config.emme.num_processors)
         max_cost = float(self.config.highway.maz_to_maz.max_skim_cost)
         spec = {
             "type": "SHORTEST_PATH",
@@ -748,7 +811,7 @@ class SkimMAZCosts(Component):
                 }
             },
             "performance_settings": {
-                "number_of_processors": num_processors,
+                "number_of_processors": self._num_processors,
                 "direction": "FORWARD",
                 "method": "STANDARD",
             },
@@ -756,7 +819,7 @@ class SkimMAZCosts(Component):
         sp_values = shortest_paths_tool(spec, self._scenario)
         return sp_values
 
-    def _export_results(self, sp_values: Dict[str, NumpyArray]):
+    def _export_results(self, sp_values: Dict[str, NumpyArray], output_file: TextIO):
         """Write matrix skims to CSV.
 
         The matrices are filtered to omit rows for which the COST is
@@ -764,28 +827,26 @@ class SkimMAZCosts(Component):
 
         sp_values: dictionary of matrix costs, with the three keys
             "COST", "DISTANCE", and "BRIDGETOLL" and Numpy arrays of values
+        output_file: open output skim file, the results are appended
         """
-        # get list of MAZ IDS
-        roots = [
-            node["@maz_root"] for node in self._network.nodes() if node["@maz_root"]
-        ]
-        leaves = [node["@maz_id"] for node in self._network.nodes() if node["@maz_id"]]
+        # get list of MAZ IDS, roots are the marked county MAZs in network order
+        roots = [node["@maz_root"] for node in self._roots]
+        leaves = self._leaf_ids
+        # drop 0's / 1e20, the flat (root, leaf) index of the remaining values is
+        # computed once and used to take the values and the to/from MAZ ids
+        cost = sp_values["COST"].ravel()
+        index = np.flatnonzero((cost > 0) & (cost < 1e19))
+        root_index, leaf_index = np.divmod(index, len(leaves))
         # build dataframe with output data and to/from MAZ ids
-        root_ids = np.repeat(roots, len(leaves))
-        leaf_ids = leaves * len(roots)
         result_df = pd.DataFrame(
             {
-                "FROM_ZONE": root_ids,
-                "TO_ZONE": leaf_ids,
-                "COST": sp_values["COST"].flatten(),
-                "DISTANCE": sp_values["DISTANCE"].flatten(),
-                "BRIDGETOLL": sp_values["BRIDGETOLL"].flatten(),
+                "FROM_ZONE": np.asarray(roots).take(root_index),
+                "TO_ZONE": leaves.take(leaf_index),
+                "COST": cost.take(index),
+                "DISTANCE": sp_values["DISTANCE"].ravel().take(index),
+                "BRIDGETOLL": sp_values["BRIDGETOLL"].ravel().take(index),
             }
         )
-        # drop 0's / 1e20
-        result_df = result_df.query("COST > 0 & COST < 1e19")
         # write remaining values to text file
         # FROM_ZONE,TO_ZONE,COST,DISTANCE,BRIDGETOLL
-        output = self.get_abs_path(self.config.highway.maz_to_maz.output_skim_file)
-        with open(output, "a", newline="", encoding="utf8") as output_file:
-            result_df.to_csv(output_file, header=False, index=False)
+        result_df.to_csv(output_file, header=False, index=False)
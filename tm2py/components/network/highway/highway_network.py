@@ -49,6 +49,9 @@ The following attributes are calculated:
 
 from typing import Dict, List, Set
 
+import numpy as np
+import pandas as pd
+
 from tm2py.components.component import Component
 from tm2py.logger import LogStartEnd
 from tm2py.emme.manager import EmmeScenario, EmmeNetwork
@@ -60,6 +63,8 @@ class PrepareNetwork(Component):
     @LogStartEnd("prepare network attributes and modes")
     def run(self):
         """Run network preparation step"""
+        # toll file is the same for all periods, read it only once
+        toll_index = self._get_toll_indices()
         for time in self.time_period_names():
             with self.controller.emme_manager.logbook_trace(
                 f"prepare for highway assignment {time}"
@@ -69,7 +74,7 @@ class PrepareNetwork(Component):
                 )
                 self._create_class_attributes(scenario, time)
                 network = scenario.get_network()
-                self._set_tolls(network, time)
+                self._set_tolls(network, time, toll_index)
                 self._set_vdf_attributes(network, time)
                 self._set_link_modes(network)
                 self._calc_link_skim_lengths(network)
@@ -118,19 +123,30 @@ class PrepareNetwork(Component):
             for name, desc in attrs:
                 create_attribute(domain, name, desc, overwrite=True, scenario=scenario)
 
-    def _set_tolls(self, network: EmmeNetwork, time_period: str):
-        """Set the tolls in the network from the toll reference file."""
-        toll_index = self._get_toll_indices()
+    def _set_tolls(
+        self,
+        network: EmmeNetwork,
+        time_period: str,
+        toll_index: Dict[int, Dict[str, float]],
+    ):
+        """Set the tolls in the network from the toll reference file lookup table."""
         src_veh_groups = self.config.highway.tolls.src_vehicle_group_names
         dst_veh_groups = self.config.highway.tolls.dst_vehicle_group_names
         tollbooth_start_index = self.config.highway.tolls.tollbooth_start_index
+        # (toll file column, link attribute) pairs, built once outside the link loop
+        period = time_period.lower()
+        bridge_tolls = [
+            (f"toll{period}_{src_veh}", f"@bridgetoll_{dst_veh}")
+            for src_veh, dst_veh in zip(src_veh_groups, dst_veh_groups)
+        ]
+        value_tolls = [
+            (f"toll{period}_{src_veh}", f"@valuetoll_{dst_veh}")
+            for src_veh, dst_veh in zip(src_veh_groups, dst_veh_groups)
+        ]
         for link in network.links():
-            if link["@tollbooth"]:
-                index = (
-                    link["@tollbooth"] * 1000
-                    + link["@tollseg"] * 10
-                    + link["@useclass"]
-                )
+            tollbooth = link["@tollbooth"]
+            if tollbooth:
+                index = tollbooth * 1000 + link["@tollseg"] * 10 + link["@useclass"]
                 data_row = toll_index.get(index)
                 if data_row is None:
                     self.logger.log(
@@ -140,29 +156,24 @@ class PrepareNetwork(Component):
                     continue  # tolls will remain at zero
                 # if index is below tollbooth start index then this is a bridge
                 # (point toll), available for all traffic assignment classes
-                if link["@tollbooth"] < tollbooth_start_index:
-                    for src_veh, dst_veh in zip(src_veh_groups, dst_veh_groups):
-                        link[f"@bridgetoll_{dst_veh}"] = (
-                            data_row[f"toll{time_period.lower()}_{src_veh}"] * 100
-                        )
+                if tollbooth < tollbooth_start_index:
+                    for src_col, dst_attr in bridge_tolls:
+                        link[dst_attr] = data_row[src_col] * 100
                 else:  # else, this is a tollway with a per-mile charge
-                    for src_veh, dst_veh in zip(src_veh_groups, dst_veh_groups):
-                        link[f"@valuetoll_{dst_veh}"] = (
-                            data_row[f"toll{time_period.lower()}_{src_veh}"]
-                            * link.length
-                            * 100
-                        )
+                    length = link.length
+                    for src_col, dst_attr in value_tolls:
+                        link[dst_attr] = data_row[src_col] * length * 100
+
+    def _get_toll_indices(self) -> Dict[int, Dict[str, float]]:
+        """Get the mapping of toll lookup table from the toll reference file.
 
-    def _get_toll_indices(self) -> Dict[int, Dict[str, str]]:
-        """Get the mapping of toll lookup table from the toll reference file."""
+        The file is parsed once with typed (numeric) columns, keyed by fac_index.
+        """
         toll_file_path = self.get_abs_path(self.config.highway.tolls.file_path)
-        tolls = {}
-        with open(toll_file_path, "r", encoding="UTF8") as toll_file:
-            header = next(toll_file).split(",")
-            for line in toll_file:
-                data = dict(zip(header, line.split(",")))
-                tolls[int(data["fac_index"])] = data
-        return tolls
+        tolls = pd.read_csv(toll_file_path, encoding="UTF8", index_col="fac_index")
+        # last row wins for duplicated fac_index values
+        tolls = tolls[~tolls.index.duplicated(keep="last")]
+        return tolls.to_dict("index")
 
     def _set_vdf_attributes(self, network: EmmeNetwork, time_period: str):
         """Set capacity, VDF and critical speed on links"""
@@ -177,7 +188,7 @@ class PrepareNetwork(Component):
             tp.name: tp.highway_capacity_factor for tp in self.config.time_periods
         }
         period_capacity_factor = tp_mapping[time_period]
-        akcelik_vdfs = [3, 4, 5, 7, 8, 10, 11, 12, 13, 14]
+        akcelik_vdfs = {3, 4, 5, 7, 8, 10, 11, 12, 13, 14}
         for link in network.links():
             cap_lanehour = capacity_map[link["@capclass"]]
             link["@capacity"] = cap_lanehour * period_capacity_factor * link["@lanes"]
@@ -205,9 +216,11 @@ class PrepareNetwork(Component):
         }
         used_modes.add(network.mode(self.config.highway.maz_to_maz.mode_code))
         for link in network.links():
-            link.modes -= used_modes
+            # compute the new set of modes and write the link modes once
+            modes = link.modes - used_modes
             if link["@drive_link"]:
-                link.modes |= auto_mode
+                modes |= auto_mode
+            link.modes = modes
         for mode in used_modes:
             if mode is not None:
                 network.delete_mode(mode)
@@ -286,28 +299,48 @@ class PrepareNetwork(Component):
         modes_set.add(mode_code)
 
     def _calc_link_skim_lengths(self, network: EmmeNetwork):
-        """Calculate the length attributes used in the highway skims."""
+        """Calculate the length attributes used in the highway skims.
+
+        Link values are read, calculated as arrays and written in bulk.
+        """
         tollbooth_start_index = self.config.highway.tolls.tollbooth_start_index
-        for link in network.links():
-            # distance in hov lanes / facilities
-            if 2 <= link["@useclass"] <= 3:
-                link["@hov_length"] = link.length
-            else:
-                link["@hov_length"] = 0
-            # distance on non-bridge toll facilities
-            if link["@tollbooth"] > tollbooth_start_index:
-                link["@toll_length"] = link.length
-            else:
-                link["@toll_length"] = 0
+        values = network.get_attribute_values(
+            "LINK", ["length", "@useclass", "@tollbooth"]
+        )
+        length, useclass, tollbooth = (np.array(data) for data in values[1:])
+        # distance in hov lanes / facilities
+        hov_length = np.where((useclass >= 2) & (useclass <= 3), length, 0)
+        # distance on non-bridge toll facilities
+        toll_length = np.where(tollbooth > tollbooth_start_index, length, 0)
+        network.set_attribute_values(
+            "LINK",
+            ["@hov_length", "@toll_length"],
+            [values[0], hov_length, toll_length],
+        )
 
     def _calc_link_class_costs(self, network: EmmeNetwork):
-        """Calculate the per-class link cost from the tolls and operating costs."""
-        for assign_class in self.config.highway.classes:
-            cost_attr = f"@cost_{assign_class.name.lower()}"
+        """Calculate the per-class link cost from the tolls and operating costs.
+
+        Reads the length and all toll attributes in one bulk call, calculates the
+        costs for all classes as arrays and writes them back in one bulk call.
+        """
+        classes = self.config.highway.classes
+        toll_attrs = sorted(
+            set(attr for assign_class in classes for attr in assign_class["toll"])
+        )
+        values = network.get_attribute_values("LINK", ["length"] + toll_attrs)
+        length = np.array(values[1])
+        tolls = {name: np.array(data) for name, data in zip(toll_attrs, values[2:])}
+        cost_attrs = []
+        costs = []
+        for assign_class in classes:
             op_cost = assign_class["operating_cost_per_mile"]
             toll_factor = assign_class.get("toll_factor")
             if toll_factor is None:
                 toll_factor = 1.0
-            for link in network.links():
-                toll_value = sum(link[toll_attr] for toll_attr in assign_class["toll"])
-                link[cost_attr] = link.length * op_cost + toll_value * toll_factor
+            toll_value = np.zeros_like(length)
+            for toll_attr in assign_class["toll"]:
+                toll_value += tolls[toll_attr]
+            cost_attrs.append(f"@cost_{assign_class.name.lower()}")
+            costs.append(length * op_cost + toll_value * toll_factor)
+        network.set_attribute_values("LINK", cost_attrs, [values[0]] + costs)
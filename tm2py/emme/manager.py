@@ -32,6 +32,8 @@ EmmeDesktopApp = _app.App
 
 # Cache running Emme projects from this process (simple singleton implementation)
 _EMME_PROJECT_REF = {}
+# Cache Modeller tools by namespace, shared across EmmeManager instances
+_EMME_TOOL_REF = {}
 
 
 class EmmeManager:
@@ -44,6 +46,11 @@ class EmmeManager:
         # mapping of Emme project path to Emme Desktop API object for reference
         # (projects are opened only once)
         self._project_cache = _EMME_PROJECT_REF
+        # mapping of tool namespace to Modeller tool object (tools are looked up once)
+        self._tool_cache = _EMME_TOOL_REF
+        # mapping of normalized Emmebank path to Emmebank object (Emmebanks are
+        # opened only once per EmmeManager, and released with it)
+        self._emmebank_cache = {}
 
     def close_all(self):
         """
@@ -54,6 +61,7 @@ class EmmeManager:
         while self._project_cache:
             _, app = self._project_cache.popitem()
             app.close()
+        self._tool_cache.clear()
 
     def create_project(self, project_dir: str, name: str) -> EmmeDesktopApp:
         """Create, open and return Emme project
@@ -94,9 +102,11 @@ class EmmeManager:
             self._project_cache[project_path] = emme_project
         return emme_project
 
-    @staticmethod
-    def emmebank(path: str) -> Emmebank:
-        """Open and return the Emmebank at path.
+    def emmebank(self, path: str) -> Emmebank:
+        """Return already open Emmebank at path, or open it if not found.
+
+        The Emmebank is opened only once per EmmeManager and the same object is
+        returned on subsequent calls (e.g. for each time period and component).
 
         Args:
             path: valid system path pointing to an Emmebank file
@@ -105,7 +115,14 @@ class EmmeManager:
         """
         if not path.endswith("emmebank"):
             path = os.path.join(path, "emmebank")
-        return Emmebank(path)
+        # normalized path only used as the cache key, the Emmebank is opened
+        # with (and reports) the path as given
+        key = os.path.normcase(os.path.realpath(path))
+        emmebank = self._emmebank_cache.get(key)
+        if emmebank is None:
+            emmebank = Emmebank(path)
+            self._emmebank_cache[key] = emmebank
+        return emmebank
 
     def change_emmebank_dimensions(
         self, emmebank: Emmebank, dimensions: Dict[str, int]
@@ -156,10 +173,16 @@ class EmmeManager:
     def tool(self, namespace: str):
         """Return the Modeller tool at namespace.
 
+        Tools are cached by namespace, the Modeller lookup is done only once.
+
         Returns:
             Corresponding Tool object, see Emme Help for full details.
         """
-        return self.modeller().tool(namespace)
+        tool = self._tool_cache.get(namespace)
+        if tool is None:
+            tool = self.modeller().tool(namespace)
+            self._tool_cache[namespace] = tool
+        return tool
 
     @staticmethod
     @_context
@@ -28,9 +28,8 @@ class MatrixCache:
     def __init__(self, scenario: EmmeScenario):
         self._scenario = scenario
         self._emmebank = scenario.emmebank
-        # mapping from matrix object to last read/write timestamp for cache invalidation
-        self._timestamps = {}
-        # cache of Emme matrix data, key: matrix object, value: numpy array of data
+        # cache of Emme matrix data, key: matrix object, value: tuple of
+        # last read/write timestamp (for cache invalidation) and numpy array of data
         self._data = {}
 
     def get_data(self, matrix: Union[str, EmmeMatrix]) -> NumpyArray:
@@ -45,11 +44,11 @@ class MatrixCache:
         if isinstance(matrix, str):
             matrix = self._emmebank.matrix(matrix)
         timestamp = matrix.timestamp
-        prev_timestamp = self._timestamps.get(matrix)
-        if prev_timestamp is None or (timestamp != prev_timestamp):
-            self._timestamps[matrix] = matrix.timestamp
-            self._data[matrix] = matrix.get_numpy_data(self._scenario.id)
-        return self._data[matrix]
+        cached = self._data.get(matrix)
+        if cached is None or cached[0] != timestamp:
+            cached = (timestamp, matrix.get_numpy_data(self._scenario.id))
+            self._data[matrix] = cached
+        return cached[1]
 
     def set_data(self, matrix: Union[str, EmmeMatrix], data: NumpyArray):
         """Set numpy array to Emme matrix (write through cache).
@@ -61,12 +60,10 @@ class MatrixCache:
         if isinstance(matrix, str):
             matrix = self._emmebank.matrix(matrix)
         matrix.set_numpy_data(data, self._scenario.id)
-        self._timestamps[matrix] = matrix.timestamp
-        self._data[matrix] = data
+        self._data[matrix] = (matrix.timestamp, data)
 
     def clear(self):
         """Clear the cache."""
-        self._timestamps = {}
         self._data = {}
 
 
@@ -89,6 +86,8 @@ class OMXManager:
             from cache (instead of always reading from Emmmebank)
         mask_max_value: optional, max value above which to write
             zero instead ("big to zero" behavior)
+        dtype: optional, data type used to write arrays, defaults to float64;
+            "float32" (the precision of Emme matrix data) halves the file size
     """
 
     def __init__(
@@ -99,12 +98,14 @@ class OMXManager:
         omx_key: str = "NAME",
         matrix_cache: MatrixCache = None,
         mask_max_value: float = None,
+        dtype: str = "float64",
     ):  # pylint: disable=R0913
         self._file_path = file_path
         self._mode = mode
         self._scenario = scenario
         self._omx_key = omx_key
         self._mask_max_value = mask_max_value
+        self._dtype = dtype
         self._omx_file = None
         self._emme_matrix_cache = matrix_cache
         self._read_cache = {}
@@ -214,6 +215,8 @@ class OMXManager:
     ):
         """Write array with name and optional attrs to OMX file.
 
+        Data is written in the dtype of the OMXManager (default float64).
+
         Args:
             numpy_array:: Numpy array
             name: name to use for the OMX key
@@ -228,26 +231,29 @@ class OMXManager:
             chunkshape = None
         if self._mask_max_value:
             numpy_array[numpy_array > self._mask_max_value] = 0
-        numpy_array = numpy_array.astype(dtype="float64", copy=False)
+        numpy_array = numpy_array.astype(dtype=self._dtype, copy=False)
         self._omx_file.create_matrix(
             name, obj=numpy_array, chunkshape=chunkshape, attrs=attrs
         )
 
-    def read(self, name: str) -> NumpyArray:
+    def read(self, name: str, cache: bool = True) -> NumpyArray:
         """Read OMX data as numpy array (standard interface).
 
         Caches matrix data (arrays) already read from disk.
 
         Args:
             name: name of OMX matrix
+            cache: if False, the array is read from disk (if not already cached)
+                and not kept in the cache, for matrices read only once
 
         Returns:
             Numpy array from OMX file
         """
-        if name in self._read_cache:
-            return self._read_cache[name]
-        data = self._omx_file[name].read()
-        self._read_cache[name] = data
+        data = self._read_cache.get(name)
+        if data is None:
+            data = self._omx_file[name].read()
+            if cache:
+                self._read_cache[name] = data
         return data
 
     def read_hdf5(self, path: str) -> NumpyArray:
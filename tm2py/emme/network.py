@@ -25,8 +25,7 @@ class NetworkCalculator:
     def __init__(self, scenario: EmmeScenario):
         self._scenario = scenario
         emme_manager = _manager.EmmeManager()
-        modeller = emme_manager.modeller()
-        self._network_calc = modeller.tool(
+        self._network_calc = emme_manager.tool(
             "inro.emme.network_calculation.network_calculator"
         )
         self._specs = []
@@ -3,6 +3,7 @@ from contextlib import contextmanager as _context
 import multiprocessing
 import os
 import re
+import shutil
 import urllib.request
 import urllib.error
 import urllib.parse
@@ -10,6 +11,13 @@ import zipfile
 
 from typing import Union
 
+# number of available processors, checked once on import
+_MAX_PROCESSORS = multiprocessing.cpu_count()
+_INT_RE = re.compile(r"^[0-9]+$")
+_MAX_MINUS_RE = re.compile(r"^MAX\s*-\s*([0-9]+)\s*$")
+# block size for streaming downloads to disk (1 MiB)
+_DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+
 
 def parse_num_processors(value: Union[str, int, float]):
     """Convert input value (parse if string) to number of processors.
@@ -22,24 +30,24 @@ def parse_num_processors(value: Union[str, int, float]):
         Exception: Input value exceeds number of available processors
         Exception: Input value less than 1 processors
     """
-    max_processors = multiprocessing.cpu_count()
+    max_processors = _MAX_PROCESSORS
     if isinstance(value, str):
         result = value.upper()
         if result == "MAX":
             return max_processors
-        if re.match("^[0-9]+$", value):
-            return int(value)
-        result = re.split(r"^MAX[\s]*-[\s]*", result)
-        if len(result) == 2:
-            return max(max_processors - int(result[1]), 1)
-        raise Exception(f"Input value {value} is an int or string as 'MAX-X'")
+        match = _MAX_MINUS_RE.match(result)
+        if match:
+            return max(max_processors - int(match.group(1)), 1)
+        # an int string is checked against the available processors below
+        if not _INT_RE.match(value):
+            raise Exception(f"Input value {value} is an int or string as 'MAX-X'")
 
     result = int(value)
     if result > max_processors:
         raise Exception(f"Input value {value} greater than available processors")
     if result < 1:
         raise Exception(f"Input value {value} less than 1 processors")
-    return value
+    return result
 
 
 @_context
@@ -75,13 +83,15 @@ def _urlopen(url):
 def _download(url: str, target_destination: str):
     """Download file with redirects (i.e. box)
 
+    The response is streamed to disk in blocks rather than read into memory.
+
     Args:
         url (str): source URL to download data from
         target_destination (str): destination file path to save download
     """
     with _urlopen(url) as response:
         with open(target_destination, "wb") as out_file:
-            out_file.write(response.read())
+            shutil.copyfileobj(response, out_file, length=_DOWNLOAD_BLOCK_SIZE)
 
 
 def _unzip(target_zip: str, target_dir: str):